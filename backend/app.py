@@ -1,17 +1,25 @@
 import os
 import logging # Add logging import
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 # Import routers and utilities
 from auth import login, register
 from questions import create as create_q, retrieve as retrieve_q, update as update_q, delete as delete_q
 from submissions import submit as submit_s, retrieve as retrieve_s, recheck as recheck_s
-from database.db_connection import connect as get_db_connection # Import 'connect' and alias it for consistency if needed, or just use 'connect'
+from database import queries
+from database.db_connection import get_db as get_db_connection # Yields a pooled connection and releases it after the request
 # from utils.auth import verify_token # Commented out as auth is disabled for now
-from utils.error_handler import http_exception_handler
+from utils.auth import require_role
+from psycopg2.pool import PoolError
+from utils.error_handler import http_exception_handler, pool_exhausted_handler
 from utils.logging_middleware import LoggingMiddleware # Import the new middleware
+from utils.admission import AdmissionControlMiddleware, admission_controller
+from utils.sticky_reads import StickyReadsMiddleware
+from utils import services
 
 # Load environment variables
 load_dotenv()
@@ -20,9 +28,25 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy clients (DB pool, storage, LLM, OCR) are created lazily by utils.services
+    # on first use in each worker, so there is nothing to set up eagerly here.
+    yield
+    logger.info("Shutting down: draining in-flight evaluations and closing services...")
+    await services.shutdown()
 
-# Add CORS middleware first
+# ORJSONResponse serializes the large submission/question lists much faster than stdlib json
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Read-your-writes across workers: carries the client's last write time in and out
+app.add_middleware(StickyReadsMiddleware)
+
+# Admission control is added before CORS so it runs inside it: shed requests
+# (503 + Retry-After) still carry CORS headers and preflights are never queued.
+app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Add CORS middleware
 origins = [
     "http://localhost",
     "http://localhost:5173", # Default Vite port
@@ -37,6 +61,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Last-Write"],
 )
 
 # Add Logging middleware *after* CORS but before routes
@@ -44,6 +69,7 @@ app.add_middleware(LoggingMiddleware)
 
 # Add custom exception handler
 app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(PoolError, pool_exhausted_handler)
 
 # --- API Routes --- #
 
@@ -59,8 +85,21 @@ app.include_router(delete_q.router, prefix="/api/questions", tags=["Questions"])
 
 # Submission Management Routes (Protected - Auth Disabled)
 app.include_router(submit_s.router, prefix="/api/submissions", tags=["Submissions"]) #, dependencies=[Depends(verify_token)])
-app.include_router(retrieve_s.router, prefix="/api/submissions", tags=["Submissions"]) #, dependencies=[Depends(verify_token)])
+# recheck_s goes before retrieve_s, otherwise GET /pending is matched by /{student_id}
 app.include_router(recheck_s.router, prefix="/api/submissions", tags=["Submissions"]) #, dependencies=[Depends(verify_token)])
+app.include_router(retrieve_s.router, prefix="/api/submissions", tags=["Submissions"]) #, dependencies=[Depends(verify_token)])
+
+# --- Admission Control Stats --- #
+@app.get("/api/admission/stats", dependencies=[Depends(require_role(['moderator']))])
+async def get_admission_stats():
+    """Admitted/shed counts, queue length and overload state per route class."""
+    return admission_controller.stats()
+
+# --- Prepared Statement Stats --- #
+@app.get("/api/db/query-stats", dependencies=[Depends(require_role(['moderator']))])
+async def get_query_stats():
+    """Execution counts and latency per registry statement (see database/queries.py)."""
+    return queries.query_stats()
 
 # --- Simple Test Route --- #
 @app.get("/api/test")
@@ -124,9 +163,23 @@ if __name__ == "__main__":
     parser.add_argument("--port", type=int, default=default_port, help=f"Port to run the server on (default: {default_port})")
     parser.add_argument("--host", type=str, default=default_host, help=f"Host to run the server on (default: {default_host})")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development.")
+    # Production mode: several worker processes, each with its own lazily created services
+    default_workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    parser.add_argument("--workers", type=int, default=default_workers, help=f"Number of worker processes (default: {default_workers})")
+    default_graceful = int(os.getenv("SHUTDOWN_TIMEOUT", 60))
+    parser.add_argument("--graceful-timeout", type=int, default=default_graceful, help=f"Seconds to wait for in-flight requests on shutdown (default: {default_graceful})")
 
     args = parser.parse_args()
-
-    logger.info(f"Starting Uvicorn server on {args.host}:{args.port}...")
-    # Use "app:app" string to enable reload correctly when running the script directly
-    uvicorn.run("app:app", host=args.host, port=args.port, reload=args.reload)
+    if args.reload and args.workers > 1:
+        parser.error("--reload cannot be combined with --workers > 1")
+
+    logger.info(f"Starting Uvicorn server on {args.host}:{args.port} with {args.workers} worker(s)...")
+    # Use "app:app" string to enable reload and multiple workers when running the script directly
+    uvicorn.run(
+        "app:app",
+        host=args.host,
+        port=args.port,
+        reload=args.reload,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
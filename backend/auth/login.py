@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import bcrypt, jwt, os, datetime
-from database.db_connection import connect
+from database.db_connection import connect, release
+from database import queries
 
 router = APIRouter()
 
@@ -13,8 +14,12 @@ class LoginRequest(BaseModel):
 async def login(req: LoginRequest):
     conn = connect()
     cur = conn.cursor()
-    cur.execute('SELECT id, password_hash, role FROM "user" WHERE username = %s', (req.username,))
-    row = cur.fetchone()
+    try:
+        queries.execute(cur, 'user_by_username', (req.username,))
+        row = cur.fetchone()
+    finally:
+        cur.close()
+        release(conn)
     if not row:
         raise HTTPException(status_code=400, detail="Invalid username or password")
     user_id, password_hash, role = row
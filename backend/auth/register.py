@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
-from database.db_connection import connect
+from database.db_connection import connect, release
 import bcrypt
 
 router = APIRouter()
@@ -32,4 +32,7 @@ async def register(req: RegisterRequest):
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        release(conn)
     return {"id": user_id, "message": "User registered successfully"}
\ No newline at end of file
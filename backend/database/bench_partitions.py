@@ -0,0 +1,121 @@
+import argparse
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from psycopg2.extras import execute_values
+from database.db_connection import connect, release
+from database.partitions import add_months, month_bounds, month_start
+from utils.ids import uuid7
+
+# Compares insert throughput and index size of the old layout (unpartitioned,
+# random UUIDv4 keys) with the new one (monthly partitions, UUIDv7 keys). Both
+# tables carry the primary key and the student_id index from init.sql. Each repeat
+# rebuilds the tables and alternates which layout goes first, so neither always
+# runs on a warm cache; medians are reported. Uses a throwaway `bench` schema, so
+# it is safe to run against a dev database:
+#   python -m database.bench_partitions --rows 200000 --months 3 --repeats 4
+
+SCHEMA = 'bench'
+
+
+def _setup(cur, months):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"""
+        CREATE TABLE {SCHEMA}.submission_v4 (
+            id UUID PRIMARY KEY,
+            student_id UUID NOT NULL,
+            pdf_link TEXT NOT NULL
+        )
+    """)
+    cur.execute(f"""
+        CREATE TABLE {SCHEMA}.submission_v7 (
+            id UUID PRIMARY KEY,
+            student_id UUID NOT NULL,
+            pdf_link TEXT NOT NULL
+        ) PARTITION BY RANGE (id)
+    """)
+    for month in months:
+        lower, upper = month_bounds(month)
+        cur.execute(
+            f"CREATE TABLE {SCHEMA}.submission_v7_{month.year:04d}_{month.month:02d} "
+            f"PARTITION OF {SCHEMA}.submission_v7 FOR VALUES FROM (%s) TO (%s)",
+            (str(lower), str(upper))
+        )
+    for table in ('submission_v4', 'submission_v7'):
+        cur.execute(f"CREATE INDEX {table}_student_id_idx ON {SCHEMA}.{table} (student_id)")
+
+
+def _insert(conn, table, rows, batch):
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        for i in range(0, len(rows), batch):
+            execute_values(cur, f"INSERT INTO {SCHEMA}.{table} (id, student_id, pdf_link) VALUES %s", rows[i:i + batch])
+            conn.commit()
+    return time.perf_counter() - start
+
+
+def _index_size(cur, table):
+    # Sum over the partition tree so partitioned and plain tables compare like for like.
+    cur.execute(
+        """
+        SELECT COALESCE(SUM(pg_relation_size(i.indexrelid)), 0)
+        FROM pg_index i
+        WHERE i.indrelid = %s::regclass
+           OR i.indrelid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+        """,
+        (f"{SCHEMA}.{table}", f"{SCHEMA}.{table}")
+    )
+    return cur.fetchone()[0]
+
+
+def run(rows: int, months: int, batch: int, repeats: int):
+    first = add_months(month_start(date.today()), -(months - 1))
+    month_list = [add_months(first, i) for i in range(months)]
+    start = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    span = datetime.now(timezone.utc) - start
+    start_ms = int(start.timestamp() * 1000)
+    step_ms = max(int(span / timedelta(milliseconds=1)) // rows, 1)
+
+    students = [str(uuid.uuid4()) for _ in range(1000)]
+    v4_rows = [(str(uuid.uuid4()), students[i % 1000], f"bench/{i}.pdf") for i in range(rows)]
+    v7_rows = [(str(uuid7(start_ms + i * step_ms)), students[i % 1000], f"bench/{i}.pdf") for i in range(rows)]
+
+    layouts = [('submission_v4', v4_rows), ('submission_v7', v7_rows)]
+    rates = {table: [] for table, _ in layouts}
+    sizes = {table: [] for table, _ in layouts}
+    conn = connect()
+    try:
+        for repeat in range(repeats):
+            with conn.cursor() as cur:
+                _setup(cur, month_list)
+            conn.commit()
+            order = layouts if repeat % 2 == 0 else layouts[::-1]
+            for table, data in order:
+                elapsed = _insert(conn, table, data, batch)
+                with conn.cursor() as cur:
+                    sizes[table].append(_index_size(cur, table))
+                rates[table].append(rows / elapsed)
+            print(f"run {repeat + 1}: " + ", ".join(f"{table} {rates[table][-1]:.0f} rows/s" for table, _ in order))
+
+        print(f"{'table':<16}{'rows/s':>12}{'index MB':>12}   (median of {repeats})")
+        for table, _ in layouts:
+            size = statistics.median(sizes[table])
+            print(f"{table:<16}{statistics.median(rates[table]):>12.0f}{size / 1024 / 1024:>12.2f}")
+
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+    finally:
+        release(conn)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark UUIDv4 vs partitioned UUIDv7 submission inserts.")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows to insert into each table (default: 200000)")
+    parser.add_argument("--months", type=int, default=3, help="Months of data / partitions to spread rows over (default: 3)")
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per INSERT/commit (default: 1000)")
+    parser.add_argument("--repeats", type=int, default=4, help="Runs per layout, alternating which goes first (default: 4)")
+    args = parser.parse_args()
+    run(args.rows, args.months, args.batch, args.repeats)
@@ -0,0 +1,53 @@
+import argparse
+import time
+from database.db_connection import connect, release
+from database.queries import PLAIN_QUERIES, PREPARED_STATEMENTS, QUERIES, _execute_prepared
+
+# Measures what server-side prepared statements save on parse/plan time by running
+# a registry statement as plain SQL text and via PREPARE/EXECUTE on the same
+# connection. Statements in queries.UNPREPARED are prepared here too, to check they
+# still belong there. Run from the backend/ directory against a database with data:
+#   python -m database.bench_prepared --query submissions_by_student --params 00000000-0000-0000-0000-000000000000 <student_id>
+
+
+def run(name, params, iterations):
+    if not PREPARED_STATEMENTS:
+        raise SystemExit("DB_PREPARED_STATEMENTS=0 is set, so both paths would run plain SQL.")
+    plain = PLAIN_QUERIES[name]
+    named = {f"p{i + 1}": value for i, value in enumerate(params)}
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        # Warm up both paths (and prepare the statement) before timing
+        cur.execute(plain, named)
+        _execute_prepared(cur, name, params)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            cur.execute(plain, named)
+            cur.fetchall()
+        unprepared = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            _execute_prepared(cur, name, params)
+            cur.fetchall()
+        prepared = time.perf_counter() - start
+        conn.rollback()
+    finally:
+        cur.close()
+        release(conn)
+
+    print(f"{name}: {iterations} executions")
+    print(f"{'unprepared':<12}{unprepared * 1000 / iterations:>10.3f} ms/query")
+    print(f"{'prepared':<12}{prepared * 1000 / iterations:>10.3f} ms/query")
+    print(f"Saved {(unprepared - prepared) * 1000 / iterations:.3f} ms/query ({(1 - prepared / unprepared) * 100:.1f}%)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark a registry statement unprepared vs prepared.")
+    parser.add_argument("--query", type=str, default='submissions_by_student', choices=sorted(n for n, q in QUERIES.items() if q.strip().upper().startswith('SELECT')), help="Registry statement to run (default: submissions_by_student)")
+    parser.add_argument("--params", nargs='*', default=[], help="Statement parameters in $1, $2, ... order")
+    parser.add_argument("--iterations", type=int, default=2000, help="Executions per path (default: 2000)")
+    args = parser.parse_args()
+    run(args.query, args.params, args.iterations)
@@ -0,0 +1,188 @@
+import os
+from datetime import date, datetime, timezone
+import psycopg2
+from database.partitions import (
+    ArchiveBlocked, PARTITIONED_TABLES, archive_partitions, ensure_partitions, month_bounds,
+    month_start, partition_name
+)
+from utils.ids import uuid7
+
+# End-to-end check of `partitions.archive` on a two-month fixture (August and
+# September 2025) in a scratch database, including a recheck filed in September
+# against an August submission. Then checks that `ensure_partitions` moves rows
+# that landed in the DEFAULT partitions into the month it creates. Uses the DB_*
+# credentials; run from backend/:
+#   python -m database.check_archive
+
+SCRATCH_DB = 'archive_check'
+MONTHS = [date(2025, 8, 1), date(2025, 9, 1)]
+
+
+def _connect(database):
+    return psycopg2.connect(
+        host=os.getenv('DB_HOST'),
+        port=os.getenv('DB_PORT'),
+        database=database,
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+def _id_in(day: datetime):
+    return str(uuid7(int(day.replace(tzinfo=timezone.utc).timestamp() * 1000)))
+
+
+def _load_fixture(conn):
+    schema_path = os.path.join(os.path.dirname(__file__), 'init.sql')
+    with conn.cursor() as cur:
+        # Supabase ships uuid-ossp; plain Postgres builds may not
+        cur.execute("SELECT to_regproc('uuid_generate_v4')")
+        if cur.fetchone()[0] is None:
+            cur.execute("CREATE FUNCTION uuid_generate_v4() RETURNS uuid AS 'SELECT gen_random_uuid()' LANGUAGE sql")
+        with open(schema_path) as f:
+            cur.execute(f.read())
+        for table in PARTITIONED_TABLES:
+            for month in MONTHS:
+                lower, upper = month_bounds(month)
+                cur.execute(
+                    f'CREATE TABLE {partition_name(table, month)} PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                    (str(lower), str(upper))
+                )
+
+        cur.execute(
+            """INSERT INTO "user" (role, first_name, last_name, username, email, password_hash)
+               VALUES ('student', 'S', 'T', 'student', 's@example.com', 'x') RETURNING id"""
+        )
+        student_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO subject (name) VALUES ('Math') RETURNING id")
+        cur.execute("INSERT INTO question (subject_id, question_text, question_rubric) VALUES (%s, 'q', 'r') RETURNING id", (cur.fetchone()[0],))
+        question_id = cur.fetchone()[0]
+
+        ids = {
+            'aug_eval': _id_in(datetime(2025, 8, 10)),
+            'aug_sub': _id_in(datetime(2025, 8, 9)),
+            'aug_recheck': _id_in(datetime(2025, 8, 11)),
+            'sep_eval': _id_in(datetime(2025, 9, 10)),
+            'sep_sub': _id_in(datetime(2025, 9, 9)),
+            'sep_recheck': _id_in(datetime(2025, 9, 11)),
+            'sep_recheck_on_aug': _id_in(datetime(2025, 9, 12)),
+            'owners': (student_id, question_id),
+        }
+        cur.execute("INSERT INTO evaluated_script (id, result, detailed_result) VALUES (%s, 5, 'ok'), (%s, 7, 'ok')",
+                    (ids['aug_eval'], ids['sep_eval']))
+        cur.execute(
+            """INSERT INTO submission (id, student_id, question_id, pdf_link, evaluation_id)
+               VALUES (%s, %s, %s, 'a.pdf', %s), (%s, %s, %s, 'b.pdf', %s)""",
+            (ids['aug_sub'], student_id, question_id, ids['aug_eval'],
+             ids['sep_sub'], student_id, question_id, ids['sep_eval'])
+        )
+        cur.execute(
+            """INSERT INTO "recheck" (id, submission_id, issue_detail)
+               VALUES (%s, %s, 'aug'), (%s, %s, 'sep'), (%s, %s, 'cross-month')""",
+            (ids['aug_recheck'], ids['aug_sub'], ids['sep_recheck'], ids['sep_sub'],
+             ids['sep_recheck_on_aug'], ids['aug_sub'])
+        )
+    conn.commit()
+    return ids
+
+
+def _attached(cur):
+    cur.execute(
+        """
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE c.relname LIKE '%_2025_08' ORDER BY 1
+        """
+    )
+    return [name for (name,) in cur.fetchall()]
+
+
+def _check_default_rows(conn, student_id, question_id):
+    # Rows inserted before this month's partitions exist land in *_default
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    evaluation_id, submission_id, recheck_id = _id_in(now), _id_in(now), _id_in(now)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO evaluated_script (id, result, detailed_result) VALUES (%s, 9, 'ok')", (evaluation_id,))
+        cur.execute(
+            "INSERT INTO submission (id, student_id, question_id, pdf_link, evaluation_id) VALUES (%s, %s, %s, 'c.pdf', %s)",
+            (submission_id, student_id, question_id, evaluation_id)
+        )
+        cur.execute('INSERT INTO "recheck" (id, submission_id, issue_detail) VALUES (%s, %s, %s)', (recheck_id, submission_id, 'now'))
+    conn.commit()
+
+    created = ensure_partitions(conn, months_ahead=0)
+    current = month_start(date.today())
+    print(f"Created with rows moved out of DEFAULT: {', '.join(created)}")
+    assert created == [partition_name(t, current) for t in PARTITIONED_TABLES], created
+    with conn.cursor() as cur:
+        for table in PARTITIONED_TABLES:
+            cur.execute(f"SELECT count(*) FROM {table}_default")
+            assert cur.fetchone()[0] == 0, table
+            cur.execute(f"SELECT count(*) FROM {partition_name(table, current)}")
+            assert cur.fetchone()[0] == 1, table
+        # The foreign keys between the partitioned tables are back
+        cur.execute(
+            "SELECT count(*) FROM pg_constraint WHERE contype = 'f' AND conparentid = 0 AND confrelid = ANY(%s::regclass[])",
+            ([f'"{t}"' for t in PARTITIONED_TABLES],)
+        )
+        assert cur.fetchone()[0] == 2
+    print("Default partition check passed.")
+
+
+def run():
+    admin = _connect(os.getenv('DB_NAME'))
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        cur.execute(f"CREATE DATABASE {SCRATCH_DB}")
+
+    conn = _connect(SCRATCH_DB)
+    try:
+        ids = _load_fixture(conn)
+        august = [partition_name(t, MONTHS[0]) for t in PARTITIONED_TABLES]
+
+        # 1. A pending September recheck points at an August submission: refuse, change nothing
+        try:
+            archive_partitions(conn, MONTHS[1])
+            raise AssertionError("archive should have been blocked by the cross-month recheck")
+        except ArchiveBlocked as e:
+            print(f"Blocked as expected: {e}")
+        with conn.cursor() as cur:
+            assert _attached(cur) == sorted(august), _attached(cur)
+
+        # 2. Once answered, the recheck is archived with August instead of blocking it
+        with conn.cursor() as cur:
+            cur.execute('UPDATE "recheck" SET response_detail = %s WHERE id = %s', ('done', ids['sep_recheck_on_aug']))
+        conn.commit()
+        detached, carried = archive_partitions(conn, MONTHS[1])
+        print(f"Detached: {', '.join(detached)} (carried {carried} recheck)")
+        assert detached == [partition_name(t, MONTHS[0]) for t in reversed(PARTITIONED_TABLES)], detached
+        assert carried == 1, carried
+
+        with conn.cursor() as cur:
+            assert _attached(cur) == [], _attached(cur)
+            for table in PARTITIONED_TABLES:
+                cur.execute(f'SELECT count(*) FROM "{table}"')
+                live = cur.fetchone()[0]
+                cur.execute(f"SELECT count(*) FROM archive.{partition_name(table, MONTHS[0])}")
+                archived = cur.fetchone()[0]
+                print(f"{table:<18} live={live} archived={archived}")
+                expected = (1, 2) if table == 'recheck' else (1, 1)
+                assert (live, archived) == expected, (table, live, archived)
+            cur.execute(f"SELECT id::text FROM archive.{partition_name('recheck', MONTHS[0])}")
+            assert ids['sep_recheck_on_aug'] in {row[0] for row in cur.fetchall()}
+            cur.execute(
+                "SELECT count(*) FROM pg_constraint WHERE contype = 'f' AND conrelid::regclass::text LIKE 'archive.%'"
+            )
+            assert cur.fetchone()[0] == 0
+        print("Archive check passed.")
+
+        _check_default_rows(conn, *ids['owners'])
+    finally:
+        conn.close()
+        with admin.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        admin.close()
+
+
+if __name__ == '__main__':
+    run()
@@ -1,24 +1,318 @@
+import contextvars
 import os
+import threading
+import time
 from dotenv import load_dotenv
-import psycopg2
+import orjson
+from psycopg2 import InterfaceError, OperationalError, extensions, pool
+from utils import services
 
 # Load environment variables from .env file in the parent directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), os.pardir, '.env'))
 
-def connect():
+# --- Replica topology --- #
+# DB_REPLICA_HOSTS is a comma separated list of "host:port" entries, e.g.
+# "localhost:5433,localhost:5434". Replicas share DB_NAME/DB_USER/DB_PASSWORD
+# with the primary. Leave it empty to send all traffic to the primary.
+STICKY_SECONDS = float(os.getenv('DB_STICKY_SECONDS', '5'))
+REPLICA_RETRY_SECONDS = float(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+# Pooled connections (primary and replicas) idle for longer than this are pinged before reuse
+PING_AFTER_SECONDS = float(os.getenv('DB_PING_AFTER_SECONDS', '1'))
+
+_lock = threading.Lock()
+_active = {}          # (host, port) -> number of checked out connections
+_unhealthy_until = {} # (host, port) -> monotonic time when we may try again
+_checked_out = {}     # id(conn) -> (host, port) of the replica it came from
+_last_write = {}      # user_id -> monotonic time of the user's last write
+
+# _last_write only covers this process. With several workers the follow-up read
+# usually lands elsewhere, so the client also carries its last write time (unix
+# seconds) in a cookie / X-Last-Write header; utils/sticky_reads.py reads it into
+# this per-request holder and sends it back after a write.
+_request_writes = contextvars.ContextVar('request_writes', default=None)
+
+
+def track_request_writes(client_last_write=None):
+    """Starts tracking writes for the current request. Returns the holder the middleware reads back."""
+    holder = {'client_last_write': client_last_write, 'wrote_at': None}
+    _request_writes.set(holder)
+    return holder
+
+
+def _client_wrote_recently():
+    holder = _request_writes.get()
+    if holder is None:
+        return False
+    if holder['wrote_at'] is not None:
+        return True
+    last = holder['client_last_write']
+    # A timestamp from the future is ignored, so a forged value cannot pin reads forever
+    return last is not None and 0 <= time.time() - last < STICKY_SECONDS
+
+
+def _replica_hosts():
+    hosts = []
+    for entry in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(':')
+        hosts.append((host, port or os.getenv('DB_PORT')))
+    return hosts
+
+
+class PooledConnection(extensions.connection):
+    """Connection that remembers which registry statements it has prepared (see database/queries.py)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        self.released_at = time.monotonic()
+
+
+class KeepIdleConnectionPool(pool.ThreadedConnectionPool):
     """
-    Establishes and returns a new database connection using environment variables.
-    The caller is responsible for closing the connection.
+    Pool that opens `minconn` connections up front but keeps up to `maxconn` idle ones
+    for reuse. psycopg2 closes any connection returned while `minconn` are already
+    idle, so a plain pool would reconnect (and re-prepare its statements) for every
+    checkout beyond `minconn` concurrent ones.
     """
-    try:
-        conn = psycopg2.connect(
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.minconn = maxconn # after __init__, psycopg2 only uses it as the idle cap
+
+
+class WaitingConnectionPool(KeepIdleConnectionPool):
+    """
+    Pool whose `getconn()` waits up to `timeout` seconds for a connection to be
+    returned when all `maxconn` are checked out, instead of raising PoolError at once.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self._returned = threading.Condition()
+
+    def getconn(self, key=None):
+        deadline = time.monotonic() + self.timeout
+        with self._returned:
+            while True:
+                try:
+                    return super().getconn(key)
+                except pool.PoolError:
+                    remaining = deadline - time.monotonic()
+                    if self.closed or remaining <= 0:
+                        raise
+                    self._returned.wait(remaining)
+
+    def putconn(self, conn, key=None, close=False):
+        super().putconn(conn, key, close)
+        with self._returned:
+            self._returned.notify()
+
+
+def create_pool():
+    """
+    Creates the connection pool for the primary. Use `services.get('db_pool')`
+    instead of calling this directly, so each worker process builds one pool lazily.
+    """
+    return WaitingConnectionPool(
+        int(os.getenv('DB_POOL_MIN', '1')),
+        int(os.getenv('DB_POOL_MAX', '10')),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', '5')),
+        host=os.getenv('DB_HOST'),
+        port=os.getenv('DB_PORT'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        connection_factory=PooledConnection
+    )
+
+
+def create_replica_pools():
+    """
+    Creates one pool per configured replica, keyed by (host, port). Use
+    `services.get('replica_pools')`. Pools start empty and connect on demand,
+    so an unreachable replica only fails (and fails over) when it is picked.
+    """
+    return {
+        (host, port): KeepIdleConnectionPool(
+            0,
+            int(os.getenv('DB_REPLICA_POOL_MAX', '10')),
+            host=host,
+            port=port,
             database=os.getenv('DB_NAME'),
             user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
+            password=os.getenv('DB_PASSWORD'),
+            connect_timeout=int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', '2')),
+            options='-c default_transaction_read_only=on',
+            connection_factory=PooledConnection
         )
-        return conn
+        for host, port in _replica_hosts()
+    }
+
+
+def _alive(conn):
+    # Pooled connections go stale when the server restarts or fails over, or when an
+    # idle timeout (Supabase, a pooler) closes them; the pool keeps them regardless.
+    if conn.closed:
+        return False
+    if time.monotonic() - conn.released_at < PING_AFTER_SECONDS:
+        return True # used moments ago, skip the round trip
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        if not conn.autocommit:
+            conn.rollback() # don't leave the ping's transaction open for the caller
+        return True
+    except (OperationalError, InterfaceError):
+        return False
+
+
+def connect():
+    """
+    Returns a connection to the primary from this process's pool.
+    The caller is responsible for returning it with `release()`.
+
+    Waits up to DB_POOL_TIMEOUT for a free connection when all DB_POOL_MAX are in
+    use, then raises PoolError (answered with 503, see app.py). Stale pooled
+    connections are dropped and replaced, as for replicas.
+    """
+    db_pool = services.get('db_pool')
+    try:
+        while True:
+            conn = db_pool.getconn()
+            if _alive(conn):
+                return conn
+            db_pool.putconn(conn, close=True)
     except Exception as e:
         print(f"Error connecting to database: {e}")
-        raise # Re-raise the exception to be handled by the caller
\ No newline at end of file
+        raise # Re-raise the exception to be handled by the caller
+
+
+def mark_write(user_id):
+    """
+    Records that `user_id` just wrote to the primary. Reads by the same user in this
+    process, and by the same client on any worker (see utils/sticky_reads.py), are
+    pinned to the primary for DB_STICKY_SECONDS so they see their own writes.
+    """
+    holder = _request_writes.get()
+    if holder is not None:
+        holder['wrote_at'] = time.time()
+    if not user_id:
+        return
+    now = time.monotonic()
+    with _lock:
+        _last_write[str(user_id)] = now
+        # Drop expired entries so users who never read again don't accumulate
+        expired = [uid for uid, last in _last_write.items() if now - last >= STICKY_SECONDS]
+        for uid in expired:
+            del _last_write[uid]
+
+
+def get_db():
+    """FastAPI dependency: yields a primary connection and returns it to the pool after the request."""
+    conn = connect()
+    try:
+        yield conn
+    finally:
+        release(conn)
+
+
+def _mark_unhealthy(key, reason):
+    print(f"Replica {key[0]}:{key[1]} unavailable, failing over: {reason}")
+    with _lock:
+        _unhealthy_until[key] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+def _checkout_replica(key):
+    """
+    Takes a live connection from the replica's pool, or returns None when the replica
+    is full or down. Idle connections go stale when the replica restarts or fails over
+    (the pool keeps them open indefinitely), so each one is checked with `_alive()`
+    before reuse and dropped if dead. Once the stale ones are gone the pool reconnects; if that fails
+    too, the replica is marked unhealthy and the caller moves on.
+    """
+    replica_pool = services.get('replica_pools')[key]
+    while True:
+        try:
+            conn = replica_pool.getconn()
+        except pool.PoolError:
+            return None # replica is healthy but at DB_REPLICA_POOL_MAX, try the next one
+        except Exception as e:
+            _mark_unhealthy(key, e)
+            return None
+        if _alive(conn):
+            conn.autocommit = True
+            return conn
+        replica_pool.putconn(conn, close=True)
+
+
+def connect_read(user_id=None):
+    """
+    Returns a connection for read-only queries. Picks the healthy replica with the
+    fewest checked out connections, and falls back to the primary when no replica
+    is configured or reachable, or when the user wrote within the sticky window.
+    Return the connection with `release()` so the connection counts stay accurate.
+    """
+    now = time.monotonic()
+    with _lock:
+        last = _last_write.get(str(user_id)) if user_id else None
+        if last is not None and now - last >= STICKY_SECONDS:
+            del _last_write[str(user_id)]
+            last = None
+        if last is not None or _client_wrote_recently():
+            candidates = []
+        else:
+            candidates = [
+                key for key in _replica_hosts()
+                if _unhealthy_until.get(key, 0) <= now
+            ]
+            candidates.sort(key=lambda key: _active.get(key, 0))
+
+    for key in candidates:
+        conn = _checkout_replica(key)
+        if conn is None:
+            continue
+        with _lock:
+            _active[key] = _active.get(key, 0) + 1
+            _checked_out[id(conn)] = key
+        return conn
+
+    return connect()
+
+
+def release(conn):
+    """
+    Returns a connection obtained from `connect()` or `connect_read()` to its pool.
+    A connection that broke during the request is closed by the pool instead of reused.
+    """
+    conn.released_at = time.monotonic()
+    with _lock:
+        key = _checked_out.pop(id(conn), None)
+        if key is not None:
+            _active[key] = max(_active.get(key, 1) - 1, 0)
+    if key is not None and conn.closed:
+        # Lost mid-request, past the checkout ping: keep reads off it until it recovers
+        _mark_unhealthy(key, "connection lost during a query")
+    if key is not None:
+        services.get('replica_pools')[key].putconn(conn)
+    else:
+        services.get('db_pool').putconn(conn)
+
+
+def fetch_json(cur, model) -> bytes:
+    """
+    Serializes the cursor's remaining rows straight to a JSON array of objects keyed
+    by column name, ready to send as a response body. Select columns under the field
+    names of `model`, the route's response model (use `AS` where they differ). The
+    model only describes the shape in the OpenAPI schema and is not run per row, so
+    the column names are checked against its fields here and a drift raises.
+    """
+    columns = [col.name for col in cur.description]
+    if set(columns) != set(model.model_fields):
+        raise RuntimeError(
+            f"Columns {sorted(columns)} do not match {model.__name__} fields {sorted(model.model_fields)}"
+        )
+    return orjson.dumps([dict(zip(columns, row)) for row in cur.fetchall()])
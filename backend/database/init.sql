@@ -68,16 +68,22 @@ CREATE TABLE question (
     question_rubric TEXT NOT NULL
 );
 
+-- Submission, evaluated_script and recheck are range partitioned by month on their id.
+-- IDs are UUIDv7 generated by the application (see utils/ids.py), so the leading bits
+-- are the creation time and each month is one contiguous id range. Monthly partitions
+-- are created by database/partitions.py; the DEFAULT partitions only catch stragglers.
+
 -- Create Evaluated Script table
 CREATE TABLE evaluated_script (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY,
     result NUMERIC NOT NULL,
     detailed_result TEXT NOT NULL
-);
+) PARTITION BY RANGE (id);
+CREATE TABLE evaluated_script_default PARTITION OF evaluated_script DEFAULT;
 
 -- Create Submission table
 CREATE TABLE submission (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY,
     student_id UUID NOT NULL REFERENCES "user"(id),
     question_id UUID NOT NULL REFERENCES question(id),
     pdf_link TEXT NOT NULL,
@@ -85,18 +91,22 @@ CREATE TABLE submission (
     evaluation_id UUID REFERENCES evaluated_script(id)
     -- Removed CONSTRAINT check_student_role CHECK (...) as it's not supported with subqueries
     -- This check should be handled in the application layer (e.g., in submissions/submit.py)
-);
+) PARTITION BY RANGE (id);
+CREATE TABLE submission_default PARTITION OF submission DEFAULT;
+CREATE INDEX submission_student_id_idx ON submission (student_id);
 
 -- Create Recheck table
 CREATE TABLE "recheck" (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY,
     submission_id UUID NOT NULL REFERENCES submission(id) ON DELETE CASCADE,
     issue_detail TEXT NOT NULL,
     response_detail TEXT,
     responser_id UUID REFERENCES "user"(id)
     -- Removed CONSTRAINT check_responser_role CHECK (...) as it's not supported with subqueries
     -- This check should be handled in the application layer (e.g., in submissions/recheck.py using require_role)
-);
+) PARTITION BY RANGE (id);
+CREATE TABLE recheck_default PARTITION OF "recheck" DEFAULT;
+CREATE INDEX recheck_pending_idx ON "recheck" (id) WHERE response_detail IS NULL;
 
 -- Create Test Table
 CREATE TABLE IF NOT EXISTS test_table (
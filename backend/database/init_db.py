@@ -1,11 +1,13 @@
 from dotenv import load_dotenv
 import os
 import psycopg2
+from database.partitions import ensure_partitions
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), os.pardir, '.env'))
 
-# Database initialization
+# Database initialization. Run from the backend/ directory:
+#   python -m database.init_db
 
 def init_db():
     # Establish connection using environment variables
@@ -24,6 +26,10 @@ def init_db():
     with conn.cursor() as cur:
         cur.execute(sql)
     conn.commit()
+    # Monthly partitions must exist before the first insert, or rows pile up in the
+    # *_default partitions (see database/partitions.py)
+    created = ensure_partitions(conn, months_ahead=3, months_back=1)
+    print(f"Created {len(created)} monthly partitions.")
     conn.close()
     print('Database initialized successfully.')
 
@@ -0,0 +1,274 @@
+import argparse
+from datetime import date, datetime
+from database.db_connection import connect, release
+from utils.ids import uuid7_bound
+
+# Monthly partition maintenance for the tables partitioned by UUIDv7 id range.
+# Run from the backend/ directory:
+#   python -m database.partitions create --months-ahead 3
+#   python -m database.partitions archive --before 2025-09
+
+# Parents are listed before children so creation follows the foreign keys
+# (submission -> evaluated_script, recheck -> submission); archiving goes in reverse.
+PARTITIONED_TABLES = ['evaluated_script', 'submission', 'recheck']
+ARCHIVE_SCHEMA = 'archive'
+
+# (referencing table, column, referenced table) between the partitioned tables
+FOREIGN_KEYS = [
+    ('recheck', 'submission_id', 'submission'),
+    ('submission', 'evaluation_id', 'evaluated_script'),
+]
+
+# Rechecks are usually filed after their submission's month has ended. Resolved ones
+# are archived together with the submission's month instead of blocking it; pending
+# ones block until a teacher answers them, so they never vanish from the queue.
+CARRIED_KEY = ('recheck', 'submission_id', 'submission')
+CARRIED_WHERE = 'c.response_detail IS NOT NULL'
+
+
+class ArchiveBlocked(Exception):
+    """Raised when rows that stay live still reference rows in the months being archived."""
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month.year:04d}_{month.month:02d}"
+
+
+def month_bounds(month: date):
+    """Returns the (inclusive, exclusive) id range of UUIDv7s created in `month`."""
+    start = datetime(month.year, month.month, 1)
+    end = add_months(month, 1)
+    return uuid7_bound(start), uuid7_bound(datetime(end.year, end.month, 1))
+
+
+def _drop_partition_foreign_keys(cur):
+    """
+    Drops the foreign keys between the partitioned tables and returns what is needed
+    to add them back. While they exist, rows cannot leave a DEFAULT partition that
+    other rows still reference (not even with DETACH).
+    """
+    cur.execute(
+        """
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conparentid = 0 AND confrelid = ANY(%s::regclass[])
+        """,
+        ([f'"{table}"' for table in PARTITIONED_TABLES],)
+    )
+    constraints = cur.fetchall()
+    for table, name, _ in constraints:
+        cur.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+    return constraints
+
+
+def _move_out_of_default(cur, table, name, lower, upper):
+    """Creates partition `name` for rows that already landed in the table's DEFAULT partition."""
+    default = f"{table}_default"
+    cur.execute(
+        f"CREATE TEMP TABLE moving ON COMMIT DROP AS SELECT * FROM {default} WHERE id >= %s AND id < %s",
+        (str(lower), str(upper))
+    )
+    cur.execute(f"DELETE FROM {default} WHERE id >= %s AND id < %s", (str(lower), str(upper)))
+    cur.execute(
+        f'CREATE TABLE {name} PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+        (str(lower), str(upper))
+    )
+    cur.execute(f"INSERT INTO {name} SELECT * FROM moving")
+    cur.execute("DROP TABLE moving")
+
+
+def ensure_partitions(conn, months_ahead: int = 3, months_back: int = 0):
+    """
+    Creates any missing monthly partitions from `months_back` ago to `months_ahead` ahead.
+
+    Postgres refuses to create a month while the DEFAULT partition holds rows in its
+    range (e.g. inserts made before partitions were created). Those rows are moved
+    into the new partition; the foreign keys between the partitioned tables are
+    dropped meanwhile and added back at the end, which re-checks every row.
+    """
+    current = month_start(date.today())
+    created = []
+    dropped_keys = None
+    try:
+        with conn.cursor() as cur:
+            for table in PARTITIONED_TABLES:
+                for offset in range(-months_back, months_ahead + 1):
+                    month = add_months(current, offset)
+                    name = partition_name(table, month)
+                    lower, upper = month_bounds(month)
+                    cur.execute("SELECT to_regclass(%s)", (name,))
+                    if cur.fetchone()[0] is not None:
+                        continue
+                    cur.execute(
+                        f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE id >= %s AND id < %s)",
+                        (str(lower), str(upper))
+                    )
+                    if cur.fetchone()[0]:
+                        if dropped_keys is None:
+                            dropped_keys = _drop_partition_foreign_keys(cur)
+                        _move_out_of_default(cur, table, name, lower, upper)
+                    else:
+                        cur.execute(
+                            f'CREATE TABLE {name} PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                            (str(lower), str(upper))
+                        )
+                    created.append(name)
+            for table, constraint, definition in dropped_keys or []:
+                cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{constraint}" {definition}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return created
+
+
+def _old_partitions(cur, table, before):
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+        """,
+        (f'"{table}"',)
+    )
+    names = []
+    for (name,) in cur.fetchall():
+        suffix = name[len(table) + 1:]
+        try:
+            month = datetime.strptime(suffix, '%Y_%m').date()
+        except ValueError:
+            continue # e.g. the DEFAULT partition
+        if month < before:
+            names.append(name)
+    return names
+
+
+def _blocking_references(cur, archived):
+    """
+    Counts rows that stay live (any partition not being archived, including DEFAULT)
+    but reference a row in a partition that is being archived, per foreign key.
+    Resolved rechecks do not count; `_carry_rechecks` archives them.
+    """
+    blocking = []
+    for child, column, parent in FOREIGN_KEYS:
+        carried = f"AND NOT ({CARRIED_WHERE})" if (child, column, parent) == CARRIED_KEY else ""
+        cur.execute(
+            f"""
+            SELECT count(*)
+            FROM "{child}" c
+            JOIN "{parent}" p ON c.{column} = p.id
+            WHERE c.tableoid <> ALL(%s::regclass[]) AND p.tableoid = ANY(%s::regclass[]) {carried}
+            """,
+            (archived[child], archived[parent])
+        )
+        count = cur.fetchone()[0]
+        if count:
+            pending = " (pending rechecks; resolve them first)" if carried else ""
+            blocking.append(f"{count} live {child} rows reference archived {parent} rows via {column}{pending}")
+    return blocking
+
+
+def _carry_rechecks(cur, name):
+    """
+    Moves live resolved rechecks of the submissions in the same month as the detached
+    recheck partition `name` into it. Detached, it no longer has a partition
+    constraint, so rechecks filed in later months fit. Returns how many were moved.
+    """
+    child, column, parent = CARRIED_KEY
+    parent_partition = parent + name[len(child):]
+    cur.execute("SELECT to_regclass(%s)", (parent_partition,))
+    if cur.fetchone()[0] is None:
+        return 0
+    cur.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM "{child}" c USING {parent_partition} p
+            WHERE c.{column} = p.id AND {CARRIED_WHERE}
+            RETURNING c.*
+        )
+        INSERT INTO {name} SELECT * FROM moved
+        """
+    )
+    return cur.rowcount
+
+
+def archive_partitions(conn, before: date):
+    """
+    Detaches every monthly partition older than `before` and moves it to the
+    `archive` schema, where it can be dumped and dropped without touching live data.
+
+    Resolved rechecks filed later against those months' submissions are archived with
+    the submission's month. Raises ArchiveBlocked (and changes nothing) if other live
+    rows still reference rows in those months, e.g. a pending recheck.
+    Returns the detached partitions and the number of rechecks carried along.
+    """
+    before = month_start(before)
+    detached = []
+    carried = 0
+    try:
+        with conn.cursor() as cur:
+            archived = {table: _old_partitions(cur, table, before) for table in PARTITIONED_TABLES}
+            blocking = _blocking_references(cur, archived)
+            if blocking:
+                raise ArchiveBlocked("; ".join(blocking))
+
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+            for table in reversed(PARTITIONED_TABLES):
+                for name in archived[table]:
+                    cur.execute(f'ALTER TABLE "{table}" DETACH PARTITION {name}')
+                    # A detached partition keeps the inherited foreign keys as its own
+                    # constraints; drop them so the parent month can be detached next.
+                    cur.execute(
+                        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                        (name,)
+                    )
+                    for (constraint,) in cur.fetchall():
+                        cur.execute(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+                    if table == CARRIED_KEY[0]:
+                        carried += _carry_rechecks(cur, name)
+                    cur.execute(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+                    detached.append(name)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return detached, carried
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of submission, evaluated_script and recheck.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    create_p = sub.add_parser('create', help="Create missing monthly partitions.")
+    create_p.add_argument("--months-ahead", type=int, default=3, help="Months after the current one to create (default: 3)")
+    create_p.add_argument("--months-back", type=int, default=0, help="Months before the current one to create (default: 0)")
+    archive_p = sub.add_parser('archive', help="Detach partitions older than a month into the archive schema.")
+    archive_p.add_argument("--before", type=str, required=True, help="First month to keep, as YYYY-MM")
+
+    args = parser.parse_args()
+    conn = connect()
+    try:
+        if args.command == 'create':
+            names = ensure_partitions(conn, args.months_ahead, args.months_back)
+            print(f"Created {len(names)} partitions: {', '.join(names) or '-'}")
+        else:
+            before = datetime.strptime(args.before, '%Y-%m').date()
+            try:
+                names, carried = archive_partitions(conn, before)
+            except ArchiveBlocked as e:
+                print(f"Nothing archived: {e}")
+                raise SystemExit(1)
+            print(f"Detached {len(names)} partitions into '{ARCHIVE_SCHEMA}': {', '.join(names) or '-'}")
+            print(f"Archived {carried} later rechecks with their submissions' month.")
+    finally:
+        release(conn)
@@ -0,0 +1,128 @@
+import os
+import re
+import threading
+import time
+from psycopg2 import errors, extensions
+
+# Registry of hot-path statements. Each one is sent to Postgres with PREPARE the
+# first time it runs on a pooled connection and with EXECUTE afterwards, so the
+# server parses and plans it once per connection instead of once per request.
+# Statements use $1, $2, ... placeholders (PREPARE syntax), not %s.
+#
+# Server-side prepared statements belong to the server session. Behind a
+# transaction-mode pooler (PgBouncer, Supabase's pooler on port 6543) consecutive
+# transactions can land on different sessions, so set DB_PREPARED_STATEMENTS=0
+# there to send every statement as plain SQL instead.
+PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', '1') != '0'
+
+QUERIES = {
+    'questions_all': """
+        SELECT id, subject_id, question_text, question_rubric FROM question
+    """,
+    'questions_by_subject': """
+        SELECT id, subject_id, question_text, question_rubric FROM question WHERE subject_id = $1
+    """,
+    'submissions_by_student': """
+        SELECT
+            s.id, s.question_id, s.pdf_link, s.solution_text, s.evaluation_id,
+            es.result::float8 AS result, es.detailed_result -- NUMERIC comes back as Decimal, which orjson rejects
+        FROM submission s
+        LEFT JOIN evaluated_script es ON s.evaluation_id = es.id AND es.id >= $1
+        WHERE s.student_id = $2 AND s.id >= $1
+        ORDER BY s.id DESC -- UUIDv7, so newest first
+    """,
+    'submission_insert': """
+        INSERT INTO submission (id, student_id, question_id, pdf_link, solution_text)
+        VALUES ($1, $2, $3, $4, $5)
+    """,
+    'submission_owner': """
+        SELECT student_id FROM submission WHERE id = $1
+    """,
+    'recheck_insert': """
+        INSERT INTO "recheck" (id, submission_id, issue_detail) VALUES ($1, $2, $3)
+    """,
+    'rechecks_pending': """
+        SELECT r.id, r.submission_id, r.issue_detail, s.student_id
+        FROM "recheck" r
+        JOIN submission s ON r.submission_id = s.id
+        WHERE r.response_detail IS NULL AND r.id >= $1
+        ORDER BY r.id DESC -- UUIDv7, so newest first
+    """,
+    'user_by_username': """
+        SELECT id, password_hash, role FROM "user" WHERE username = $1
+    """,
+}
+
+
+def _as_plain_sql(sql):
+    # $1, $2, ... -> %(p1)s, %(p2)s, ... so psycopg2 can send the same text unprepared
+    return re.sub(r'\$(\d+)', r'%(p\1)s', sql.replace('%', '%%'))
+
+
+PLAIN_QUERIES = {name: _as_plain_sql(sql) for name, sql in QUERIES.items()}
+
+# Always sent as plain SQL: a single-row lookup by id on a partitioned table is
+# cheap to plan with the literal (pruned at plan time), while the generic plan of a
+# prepared statement has to prune partitions on every execution and measured slower.
+UNPREPARED = {'submission_owner'}
+
+_lock = threading.Lock()
+_stats = {} # name -> [executions, total seconds, max seconds]
+
+
+def _execute_prepared(cur, name, params):
+    conn = cur.connection
+    if params:
+        statement = f"EXECUTE {name} ({', '.join(['%s'] * len(params))})"
+    else:
+        statement, params = f"EXECUTE {name}", None
+    # Rolling back is only safe if nothing ran before this statement in the transaction
+    starts_transaction = conn.autocommit or conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+    for attempt in range(2):
+        if name not in conn.prepared:
+            cur.execute(f"PREPARE {name} AS {QUERIES[name]}")
+            conn.prepared.add(name)
+        try:
+            cur.execute(statement, params)
+            return
+        except errors.InvalidSqlStatementName:
+            # The server session no longer has it (DISCARD ALL, pooler switched sessions)
+            conn.prepared.discard(name)
+            if attempt or not starts_transaction:
+                raise # the caller's transaction is aborted; the next call prepares it again
+            conn.rollback()
+
+
+def execute(cur, name: str, params=()):
+    """
+    Runs the registry statement `name` on `cur`, preparing it first if this
+    connection has not seen it yet (or as plain SQL with DB_PREPARED_STATEMENTS=0).
+    Results are read from `cur` as usual.
+    """
+    start = time.perf_counter()
+    if PREPARED_STATEMENTS and name not in UNPREPARED:
+        _execute_prepared(cur, name, params)
+    else:
+        cur.execute(PLAIN_QUERIES[name], {f"p{i + 1}": value for i, value in enumerate(params)})
+    elapsed = time.perf_counter() - start
+
+    with _lock:
+        entry = _stats.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+
+def query_stats():
+    """Per-statement execution counts and latency (ms) for this worker process."""
+    with _lock:
+        return {
+            name: {
+                "executions": count,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total * 1000 / count, 3),
+                "max_ms": round(worst * 1000, 3),
+            }
+            for name, (count, total, worst) in sorted(_stats.items())
+        }
@@ -1,10 +1,8 @@
 \
 import os
-# import google.generativeai as genai # Example for Google AI
-
-# Configure the LLM client (e.g., API key)
-# GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-# genai.configure(api_key=GOOGLE_API_KEY)
+# The LLM client is configured lazily by utils.services (GOOGLE_API_KEY, LLM_MODEL),
+# so importing this module does not import the SDK.
+# from utils import services
 
 def call_llm(solution_text: str, question_text: str, rubric: str):
     """
@@ -27,7 +25,7 @@ def call_llm(solution_text: str, question_text: str, rubric: str):
     # """
 
     # try:
-    #     # model = genai.GenerativeModel('gemini-pro') # Example model
+    #     # model = services.get('llm')
     #     # response = model.generate_content(prompt)
     #     # Parse response (assuming JSON format)
     #     # evaluation_data = json.loads(response.text)
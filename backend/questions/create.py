@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from utils.auth import require_role
-from database.db_connection import connect
+from database.db_connection import connect, mark_write, release
 import uuid
 
 router = APIRouter()
@@ -22,7 +22,11 @@ async def create_question(req: QuestionCreateRequest, user=Depends(require_role(
             (question_id, req.subject_id, req.question_text, req.question_rubric)
         )
         conn.commit()
+        mark_write(user.get('user_id'))
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        release(conn)
     return {"id": question_id, "message": "Question created"}
\ No newline at end of file
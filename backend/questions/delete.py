@@ -1,7 +1,7 @@
 \
 from fastapi import APIRouter, HTTPException, Depends
 from utils.auth import require_role
-from database.db_connection import connect
+from database.db_connection import connect, mark_write, release
 
 router = APIRouter()
 
@@ -14,7 +14,11 @@ async def delete_question(question_id: str, user=Depends(require_role(['teacher'
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Question not found")
         conn.commit()
+        mark_write(user.get('user_id'))
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        release(conn)
     return {"message": "Question deleted"}
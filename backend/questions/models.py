@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+# Response models for the question endpoints, used for the OpenAPI schema only.
+# List routes send rows from `fetch_json()`, which checks that the selected
+# column names match these field names.
+
+
+class QuestionOut(BaseModel):
+    id: str
+    subject_id: str
+    question_text: str
+    question_rubric: str
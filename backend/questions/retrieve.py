@@ -1,32 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
-from database.db_connection import connect
+from utils.auth import get_optional_user
+from database.db_connection import connect_read, release, fetch_json
+from database import queries
+from questions.models import QuestionOut
 
 router = APIRouter()
 
-@router.get("", response_model=List[dict])
-async def retrieve_questions(subject_id: Optional[str] = Query(None)):
-    conn = connect()
+@router.get("", response_model=List[QuestionOut])
+async def retrieve_questions(subject_id: Optional[str] = Query(None), user=Depends(get_optional_user)):
+    # Public endpoint; a logged-in teacher who just edited questions reads them back from the primary
+    conn = connect_read(user.get('user_id') if user else None)
     cur = conn.cursor()
     try:
         if subject_id:
-            cur.execute(
-                "SELECT id, subject_id, question_text, question_rubric FROM question WHERE subject_id = %s",
-                (subject_id,)
-            )
+            queries.execute(cur, 'questions_by_subject', (subject_id,))
         else:
-            cur.execute(
-                "SELECT id, subject_id, question_text, question_rubric FROM question"
-            )
-        rows = cur.fetchall()
+            queries.execute(cur, 'questions_all')
+        body = fetch_json(cur, QuestionOut)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    result = []
-    for r in rows:
-        result.append({
-            "id": r[0],
-            "subject_id": r[1],
-            "question_text": r[2],
-            "question_rubric": r[3]
-        })
-    return result
\ No newline at end of file
+    finally:
+        cur.close()
+        release(conn)
+    # Already serialized; response_model only documents the shape
+    return Response(content=body, media_type="application/json")
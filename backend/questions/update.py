@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from utils.auth import require_role
-from database.db_connection import connect
+from database.db_connection import connect, mark_write, release
 
 router = APIRouter()
 
@@ -21,7 +21,11 @@ async def update_question(question_id: str, req: QuestionUpdateRequest, user=Dep
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Question not found")
         conn.commit()
+        mark_write(user.get('user_id'))
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        cur.close()
+        release(conn)
     return {"message": "Question updated"}
\ No newline at end of file
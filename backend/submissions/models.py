@@ -0,0 +1,23 @@
+from typing import Optional
+from pydantic import BaseModel
+
+# Response models for the submission endpoints, used for the OpenAPI schema only.
+# List routes send rows from `fetch_json()`, which checks that the selected
+# column names match these field names.
+
+
+class SubmissionOut(BaseModel):
+    id: str
+    question_id: str
+    pdf_link: str
+    solution_text: Optional[str] = None
+    evaluation_id: Optional[str] = None
+    result: Optional[float] = None
+    detailed_result: Optional[str] = None
+
+
+class PendingRecheckOut(BaseModel):
+    id: str
+    submission_id: str
+    issue_detail: str
+    student_id: str
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 from utils.auth import require_role
-from database.db_connection import connect
-import uuid
+from database.db_connection import connect, connect_read, mark_write, release, fetch_json
+from database import queries
+from submissions.models import PendingRecheckOut
+from utils.ids import uuid7, uuid7_bound
 
 router = APIRouter()
 
@@ -17,27 +20,26 @@ class RecheckRequest(BaseModel):
 async def request_recheck(req: RecheckRequest, user=Depends(require_role(['student']))):
     conn = connect()
     cur = conn.cursor()
-    recheck_id = str(uuid.uuid4())
+    recheck_id = str(uuid7())
     student_id = user.get('user_id') # Get student ID from token
 
     try:
         # Verify the submission belongs to the student requesting the recheck
-        cur.execute("SELECT student_id FROM submission WHERE id = %s", (req.submission_id,))
+        queries.execute(cur, 'submission_owner', (req.submission_id,))
         submission_owner = cur.fetchone()
         if not submission_owner or str(submission_owner[0]) != student_id:
              raise HTTPException(status_code=403, detail="Cannot request recheck for another student's submission")
 
-        # Insert recheck request using quoted identifier
-        cur.execute(
-            'INSERT INTO "recheck" (id, submission_id, issue_detail) VALUES (%s, %s, %s)',
-            (recheck_id, req.submission_id, req.issue_detail)
-        )
+        # Insert recheck request
+        queries.execute(cur, 'recheck_insert', (recheck_id, req.submission_id, req.issue_detail))
         conn.commit()
+        mark_write(student_id)
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     finally:
         cur.close()
+        release(conn)
 
     return {"id": recheck_id, "message": "Recheck requested successfully"}
 
@@ -71,46 +73,35 @@ async def respond_to_recheck(recheck_id: str, req: RecheckResponse, user=Depends
         #    Update evaluated_script table
 
         conn.commit()
+        mark_write(responser_id)
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     finally:
         cur.close()
+        release(conn)
 
     return {"message": "Recheck resolved successfully"}
 
 
 # --- Get Pending Rechecks (Teacher/Moderator) ---
 
-@router.get("/pending", response_model=List[dict])
-async def get_pending_rechecks(user=Depends(require_role(['teacher', 'moderator']))):
-    conn = connect()
+@router.get("/pending", response_model=List[PendingRecheckOut])
+async def get_pending_rechecks(since: Optional[datetime] = Query(None), user=Depends(require_role(['teacher', 'moderator']))):
+    lower_bound = str(uuid7_bound(since or datetime(1970, 1, 1))) # prunes older recheck partitions
+
+    conn = connect_read(user.get('user_id'))
     cur = conn.cursor()
     try:
         # Select rechecks without a response, joining to get student/submission info
-        cur.execute(
-            """
-            SELECT r.id, r.submission_id, r.issue_detail, s.student_id
-            FROM "recheck" r
-            JOIN submission s ON r.submission_id = s.id
-            WHERE r.response_detail IS NULL
-            ORDER BY r.id DESC -- Or some timestamp
-            """
-        )
-        rows = cur.fetchall()
+        queries.execute(cur, 'rechecks_pending', (lower_bound,))
+        body = fetch_json(cur, PendingRecheckOut)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         cur.close()
+        release(conn)
 
-    result = []
-    for r in rows:
-        result.append({
-            "id": r[0],
-            "submission_id": r[1],
-            "issue_detail": r[2],
-            "student_id": r[3]
-            # TODO: Consider joining with user table to get student name/username
-        })
-    return result
+    # Already serialized; response_model only documents the shape
+    return Response(content=body, media_type="application/json")
 
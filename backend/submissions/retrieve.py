@@ -1,48 +1,36 @@
 \
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
+from datetime import datetime
 from utils.auth import require_role
-from database.db_connection import connect
+from utils.ids import uuid7_bound
+from database.db_connection import connect_read, release, fetch_json
+from database import queries
+from submissions.models import SubmissionOut
 
 router = APIRouter()
 
-@router.get("/{student_id}", response_model=List[dict])
-async def retrieve_submissions(student_id: str, user=Depends(require_role(['student', 'teacher', 'moderator']))):
+@router.get("/{student_id}", response_model=List[SubmissionOut])
+async def retrieve_submissions(student_id: str, since: Optional[datetime] = Query(None), user=Depends(require_role(['student', 'teacher', 'moderator']))):
     # TODO: Add logic to ensure student can only access their own submissions
     # if user.get('role') == 'student' and user.get('user_id') != student_id:
     #     raise HTTPException(status_code=403, detail="Forbidden")
 
-    conn = connect()
+    # IDs are UUIDv7, so `since` becomes an id range that lets Postgres skip older partitions.
+    # Evaluations are always created after their submission, so the same bound applies to them.
+    lower_bound = str(uuid7_bound(since or datetime(1970, 1, 1)))
+
+    conn = connect_read(user.get('user_id'))
     cur = conn.cursor()
     try:
         # Join submission with evaluated_script to get results
-        cur.execute(
-            """
-            SELECT
-                s.id, s.question_id, s.pdf_link, s.solution_text, s.evaluation_id,
-                es.result, es.detailed_result
-            FROM submission s
-            LEFT JOIN evaluated_script es ON s.evaluation_id = es.id
-            WHERE s.student_id = %s
-            ORDER BY s.id DESC -- Or some timestamp field
-            """,
-            (student_id,)
-        )
-        rows = cur.fetchall()
+        queries.execute(cur, 'submissions_by_student', (lower_bound, student_id))
+        body = fetch_json(cur, SubmissionOut)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         cur.close()
+        release(conn)
 
-    result = []
-    for r in rows:
-        result.append({
-            "id": r[0],
-            "question_id": r[1],
-            "pdf_link": r[2],
-            "solution_text": r[3],
-            "evaluation_id": r[4],
-            "result": r[5],
-            "detailed_result": r[6]
-        })
-    return result
+    # Already serialized; response_model only documents the shape
+    return Response(content=body, media_type="application/json")
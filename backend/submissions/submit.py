@@ -1,11 +1,12 @@
 \
 import os
-import uuid
 from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
 from pydantic import BaseModel
 from utils.auth import require_role
-from database.db_connection import connect
-# from utils.firebase import bucket # Import Firebase bucket
+from database.db_connection import connect, mark_write, release
+from database import queries
+from utils.ids import uuid7
+# from utils import services # services.get('storage') returns the Firebase bucket
 # from utils.ocr import extract_text_from_pdf # Placeholder for OCR utility
 
 router = APIRouter()
@@ -25,7 +26,7 @@ async def submit_answer(
 
     conn = connect()
     cur = conn.cursor()
-    submission_id = str(uuid.uuid4())
+    submission_id = str(uuid7())
     pdf_link = ""
     solution_text = ""
 
@@ -33,7 +34,7 @@ async def submit_answer(
         # --- 1. Upload PDF to Firebase ---
         # file_content = await pdf_file.read()
         # file_name = f"submissions/{student_id}/{submission_id}.pdf"
-        # blob = bucket.blob(file_name)
+        # blob = services.get('storage').blob(file_name)
         # blob.upload_from_string(file_content, content_type='application/pdf')
         # pdf_link = blob.public_url # Or signed URL
         pdf_link = f"placeholder/firebase/url/for/{submission_id}.pdf" # Placeholder
@@ -45,18 +46,17 @@ async def submit_answer(
         print("Placeholder: Extracted text from PDF.")
 
         # --- 3. Save Submission to Database ---
-        cur.execute(
-            """
-            INSERT INTO submission (id, student_id, question_id, pdf_link, solution_text)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
+        queries.execute(
+            cur, 'submission_insert',
             (submission_id, student_id, question_id, pdf_link, solution_text)
         )
         conn.commit()
+        mark_write(user.get('user_id'))
 
         # --- 4. Trigger LLM Evaluation (Optional - can be async) ---
         # Consider triggering evaluation here or via a separate process/queue
-        # Example: call evaluate_submission(submission_id) from llm.evaluate
+        # Example: services.run_in_background(evaluate_submission(submission_id)) from llm.evaluate,
+        # which lets shutdown drain the evaluation instead of cutting it off
         print("Placeholder: Evaluation trigger would go here.")
 
     except Exception as e:
@@ -65,7 +65,7 @@ async def submit_answer(
         raise HTTPException(status_code=500, detail=f"Submission failed: {str(e)}")
     finally:
         cur.close()
-        # conn.close() # Keep connection open if using a pool
+        release(conn)
 
     return {"id": submission_id, "pdf_link": pdf_link, "message": "Submission created successfully"}
 
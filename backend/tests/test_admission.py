@@ -0,0 +1,116 @@
+import asyncio
+import random
+from utils.admission import READ, AdmissionControlMiddleware, AdmissionController, RouteClassLimiter
+
+# Admission control tests; no database needed. Run from backend/:
+#   python -m pytest tests
+
+
+def _assert_idle(limiter, limit):
+    assert limiter.in_flight == 0
+    assert limiter.waiting == 0
+    assert limiter._sem._value == limit # every permit is back
+
+
+def test_no_permit_leak_under_timeouts():
+    # 50 workers x 200 acquires against 4 permits with timeouts tight enough that
+    # many acquires race the timeout; the limit must not shrink.
+    limiter = RouteClassLimiter('read', limit=4, target=0.0005, interval=0.002)
+
+    async def worker():
+        for _ in range(200):
+            if await limiter.acquire():
+                await asyncio.sleep(random.choice([0, 0, 0.0005]))
+                limiter.release()
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(50)))
+
+    asyncio.run(main())
+    _assert_idle(limiter, 4)
+    assert limiter.admitted + limiter.shed == 50 * 200
+    assert limiter.admitted > 0 and limiter.shed > 0
+
+
+def test_cancelled_waiters_return_their_permits():
+    limiter = RouteClassLimiter('read', limit=2, target=1.0, interval=1.0)
+
+    async def main():
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        waiters = [asyncio.ensure_future(limiter.acquire()) for _ in range(20)]
+        await asyncio.sleep(0)
+        # Free the permits and cancel the waiters in the same tick, so some of them
+        # are granted a permit they will never use.
+        limiter.release()
+        limiter.release()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0) # let the done-callbacks hand permits back
+
+    asyncio.run(main())
+    _assert_idle(limiter, 2)
+
+
+def test_streaming_response_holds_permit_until_last_chunk():
+    controller = AdmissionController()
+    limiter = RouteClassLimiter(READ, limit=1, target=0.01, interval=0.01)
+    controller.limiters[READ] = limiter
+    resume = asyncio.Event()
+    sent = []
+
+    async def streaming_app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'first', 'more_body': True})
+        await resume.wait()
+        await send({'type': 'http.response.body', 'body': b'last'})
+
+    middleware = AdmissionControlMiddleware(streaming_app, controller=controller)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/api/questions', 'headers': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        sent.append(message)
+
+    async def main():
+        request = asyncio.ensure_future(middleware(scope, receive, send))
+        while len(sent) < 2:
+            await asyncio.sleep(0)
+        assert limiter.in_flight == 1 # body still streaming
+
+        shed = []
+        async def shed_send(message):
+            shed.append(message)
+        await middleware(scope, receive, shed_send)
+        assert shed[0]['status'] == 503
+
+        resume.set()
+        await request
+
+    asyncio.run(main())
+    assert sent[-1]['body'] == b'last'
+    _assert_idle(limiter, 1)
+
+
+def test_permit_released_when_app_raises():
+    controller = AdmissionController()
+    limiter = RouteClassLimiter(READ, limit=1, target=0.01, interval=0.01)
+    controller.limiters[READ] = limiter
+
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    middleware = AdmissionControlMiddleware(failing_app, controller=controller)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/api/questions', 'headers': []}
+
+    async def main():
+        try:
+            await middleware(scope, None, None)
+        except RuntimeError:
+            pass
+
+    asyncio.run(main())
+    _assert_idle(limiter, 1)
@@ -0,0 +1,33 @@
+from collections import namedtuple
+import orjson
+import pytest
+from database.db_connection import fetch_json
+from questions.models import QuestionOut
+from submissions.models import PendingRecheckOut
+
+# fetch_json() against a stand-in cursor; no database needed.
+
+Column = namedtuple('Column', 'name')
+
+
+class FakeCursor:
+    def __init__(self, columns, rows):
+        self.description = [Column(name) for name in columns]
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_rows_become_objects_keyed_by_column():
+    cur = FakeCursor(['id', 'subject_id', 'question_text', 'question_rubric'], [('q1', 's1', 'text', 'rubric')])
+    body = fetch_json(cur, QuestionOut)
+    assert orjson.loads(body) == [{'id': 'q1', 'subject_id': 's1', 'question_text': 'text', 'question_rubric': 'rubric'}]
+    QuestionOut.model_validate(orjson.loads(body)[0])
+
+
+def test_column_drift_raises():
+    # e.g. a query renamed student_id without updating PendingRecheckOut
+    cur = FakeCursor(['id', 'submission_id', 'issue_detail', 'owner_id'], [])
+    with pytest.raises(RuntimeError, match='PendingRecheckOut'):
+        fetch_json(cur, PendingRecheckOut)
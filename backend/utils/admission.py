@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Route classes in priority order. Submissions and logins must keep working at
+# exam deadlines; list and analytics reads are the first to be shed.
+CRITICAL = 'critical'
+WRITE = 'write'
+READ = 'read'
+
+CRITICAL_ROUTES = {
+    ('POST', '/api/submissions'),
+    ('POST', '/api/auth/login'),
+}
+
+# Not subject to admission control, so load can still be observed while shedding.
+# Both require a moderator token (see app.py).
+EXEMPT_PATHS = {'/api/admission/stats', '/api/db/query-stats'}
+
+
+def classify(method: str, path: str):
+    """Returns the route class of a request, or None if it bypasses admission control."""
+    if method == 'OPTIONS' or not path.startswith('/api/') or path in EXEMPT_PATHS:
+        return None
+    if (method, path) in CRITICAL_ROUTES:
+        return CRITICAL
+    if method in ('GET', 'HEAD'):
+        return READ
+    return WRITE
+
+
+class RouteClassLimiter:
+    """
+    Concurrency limit plus CoDel-style queue management for one route class.
+
+    Requests over the limit wait in a queue. While the minimum queueing delay seen
+    in the last `interval` stayed below `target`, a request may wait up to `interval`;
+    once it has stayed above `target` the class counts as overloaded and requests
+    are shed as soon as they have waited `target`.
+    """
+
+    def __init__(self, name: str, limit: int, target: float, interval: float):
+        self.name = name
+        self.limit = limit
+        self.target = target
+        self.interval = interval
+        self._sem = asyncio.Semaphore(limit)
+        self._min_delay = math.inf
+        self._interval_end = time.monotonic() + interval
+        self.overloaded = False
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def _record_delay(self, delay: float):
+        now = time.monotonic()
+        self._min_delay = min(self._min_delay, delay)
+        if now >= self._interval_end:
+            self.overloaded = self._min_delay > self.target
+            self._min_delay = math.inf
+            self._interval_end = now + self.interval
+
+    def reject(self):
+        self.shed += 1
+
+    def _abandon(self, acquire: asyncio.Task):
+        # The acquire may already hold a permit (it won the race with the timeout or
+        # completed despite the cancel); hand that permit back instead of leaking it.
+        acquire.cancel()
+        acquire.add_done_callback(
+            lambda task: None if task.cancelled() or task.exception() else self._sem.release()
+        )
+
+    async def _acquire_within(self, timeout: float) -> bool:
+        if not self._sem.locked():
+            await self._sem.acquire() # free permit, returns without waiting
+            return True
+        acquire = asyncio.ensure_future(self._sem.acquire())
+        try:
+            # Unlike wait_for, wait() never cancels `acquire` itself, so a permit
+            # granted right at the timeout is not lost.
+            done, _ = await asyncio.wait({acquire}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(acquire)
+            raise
+        if done:
+            return True
+        self._abandon(acquire)
+        return False
+
+    async def acquire(self) -> bool:
+        timeout = self.target if self.overloaded else max(self.interval, self.target)
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            acquired = await self._acquire_within(timeout)
+        finally:
+            self.waiting -= 1
+        self._record_delay(time.monotonic() - start)
+        if not acquired:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._sem.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "overloaded": self.overloaded,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionController:
+    """Holds one limiter per route class. Limits and targets come from environment variables."""
+
+    def __init__(self):
+        interval = float(os.getenv('ADMISSION_INTERVAL_MS', '100')) / 1000
+        defaults = {CRITICAL: (64, 200), WRITE: (16, 50), READ: (16, 20)}
+        self.limiters = {}
+        for name, (limit, target_ms) in defaults.items():
+            self.limiters[name] = RouteClassLimiter(
+                name,
+                limit=int(os.getenv(f'ADMISSION_LIMIT_{name.upper()}', limit)),
+                target=float(os.getenv(f'ADMISSION_TARGET_MS_{name.upper()}', target_ms)) / 1000,
+                interval=interval,
+            )
+        self.retry_after = int(os.getenv('ADMISSION_RETRY_AFTER', '2'))
+
+    async def acquire(self, route_class: str) -> bool:
+        limiter = self.limiters[route_class]
+        # Reads never compete with queued submissions/logins for the database.
+        if route_class == READ and self.limiters[CRITICAL].waiting > 0:
+            limiter.reject()
+            return False
+        return await limiter.acquire()
+
+    def release(self, route_class: str):
+        self.limiters[route_class].release()
+
+    def stats(self):
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware, so the permit is held until the last body chunk has been
+    sent (BaseHTTPMiddleware's call_next returns before the body is streamed).
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope['method'], scope['path'])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(route_class):
+            logger.warning(f"Shed {route_class} request: {scope['method']} {scope['path']}")
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly."},
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        released = False
+
+        def release_once():
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(route_class)
+
+        async def send_and_release(message: Message):
+            await send(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                release_once()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release_once() # errors and disconnects before the final body
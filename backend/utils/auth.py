@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -18,6 +19,18 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise HTTPException(status_code=401, detail='Invalid or expired token')
 
 
+def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(optional_security)):
+    """Like get_current_user, but returns None for anonymous or invalid tokens (for public endpoints)"""
+    if credentials is None:
+        return None
+    secret = os.getenv('JWT_SECRET_KEY')
+    alg = os.getenv('JWT_ALGORITHM', 'HS256')
+    try:
+        return jwt.decode(credentials.credentials, secret, algorithms=[alg])
+    except jwt.PyJWTError:
+        return None
+
+
 def require_role(allowed_roles: list):
     """Dependency to enforce role-based access"""
     def role_checker(user = Depends(get_current_user)):
@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List
+import httpx
+import jwt
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from psycopg2.extras import execute_values
+from app import app
+from database.db_connection import connect, connect_read, release
+from submissions.models import SubmissionOut
+from utils.ids import uuid7
+
+# Times GET /api/submissions/{student_id} end to end (auth, middleware, DB, response
+# serialization) through the real app, which sends rows to orjson via fetch_json(),
+# against two older ways of building the same response. Seeds a student with --rows
+# submissions and deletes them afterwards. Reads go through connect_read(), so point
+# DB_REPLICA_HOSTS at real replicas or leave it empty. Uses the DB_* and JWT_SECRET_KEY
+# settings; run from backend/:
+#   python -m utils.bench_serialization --rows 10000
+
+ROWS_SQL = """
+    SELECT
+        s.id, s.question_id, s.pdf_link, s.solution_text, s.evaluation_id,
+        es.result, es.detailed_result
+    FROM submission s
+    LEFT JOIN evaluated_script es ON s.evaluation_id = es.id
+    WHERE s.student_id = %s
+    ORDER BY s.id DESC
+"""
+
+bench_router = APIRouter()
+
+
+@bench_router.get("/legacy/{student_id}", response_class=JSONResponse)
+async def legacy_submissions(student_id: str):
+    # Before orjson: dicts from tuple indexes, jsonable_encoder + stdlib json
+    conn = connect_read()
+    cur = conn.cursor()
+    try:
+        cur.execute(ROWS_SQL, (student_id,))
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+        release(conn)
+    result = []
+    for r in rows:
+        result.append({
+            "id": r[0],
+            "question_id": r[1],
+            "pdf_link": r[2],
+            "solution_text": r[3],
+            "evaluation_id": r[4],
+            "result": r[5],
+            "detailed_result": r[6]
+        })
+    return result
+
+
+@bench_router.get("/typed/{student_id}", response_model=List[SubmissionOut])
+async def typed_submissions(student_id: str):
+    # Dicts keyed by column name, validated into List[SubmissionOut], then orjson
+    conn = connect_read()
+    cur = conn.cursor()
+    try:
+        cur.execute(ROWS_SQL, (student_id,))
+        columns = [col.name for col in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+        release(conn)
+    return rows
+
+
+def _seed(n):
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        suffix = uuid7().hex[-12:]
+        cur.execute(
+            """INSERT INTO "user" (role, first_name, last_name, username, email, password_hash)
+               VALUES ('student', 'Bench', 'Student', %s, %s, 'x') RETURNING id""",
+            (f"bench_{suffix}", f"bench_{suffix}@example.com")
+        )
+        student_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO subject (name) VALUES (%s) RETURNING id", (f"bench_{suffix}",))
+        subject_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO question (subject_id, question_text, question_rubric) VALUES (%s, 'q', 'r') RETURNING id", (subject_id,))
+        question_id = cur.fetchone()[0]
+
+        evaluations, submissions = [], []
+        for i in range(n):
+            evaluation_id, submission_id = str(uuid7()), str(uuid7())
+            evaluations.append((evaluation_id, 7.5, "y" * 300))
+            submissions.append((submission_id, student_id, question_id, f"submissions/{i}.pdf", "x" * 500, evaluation_id))
+        execute_values(cur, "INSERT INTO evaluated_script (id, result, detailed_result) VALUES %s", evaluations)
+        execute_values(cur, "INSERT INTO submission (id, student_id, question_id, pdf_link, solution_text, evaluation_id) VALUES %s", submissions)
+        conn.commit()
+        return student_id, subject_id, question_id, [e[0] for e in evaluations]
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        release(conn)
+
+
+def _cleanup(student_id, subject_id, question_id, evaluation_ids):
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM submission WHERE student_id = %s", (student_id,))
+        cur.execute("DELETE FROM evaluated_script WHERE id = ANY(%s::uuid[])", (evaluation_ids,))
+        cur.execute("DELETE FROM question WHERE id = %s", (question_id,))
+        cur.execute("DELETE FROM subject WHERE id = %s", (subject_id,))
+        cur.execute('DELETE FROM "user" WHERE id = %s', (student_id,))
+        conn.commit()
+    finally:
+        cur.close()
+        release(conn)
+
+
+async def _best_of(client, path, headers, runs):
+    best, body = float('inf'), None
+    for _ in range(runs + 1): # first request warms up connections and prepared statements
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        if body is not None:
+            best = min(best, elapsed)
+        body = response.content
+    return best, body
+
+
+async def run(rows, runs):
+    app.include_router(bench_router, prefix="/bench")
+    student_id, *seeded = _seed(rows)
+    token = jwt.encode({'user_id': str(student_id), 'role': 'teacher'}, os.getenv('JWT_SECRET_KEY'),
+                       algorithm=os.getenv('JWT_ALGORITHM', 'HS256'))
+    headers = {'Authorization': f"Bearer {token}"}
+    paths = [
+        ("dict + stdlib json", f"/bench/legacy/{student_id}"),
+        ("typed model + orjson", f"/bench/typed/{student_id}"),
+        ("row dicts + orjson (shipped)", f"/api/submissions/{student_id}"),
+    ]
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            results = [(label, *await _best_of(client, path, headers, runs)) for label, path in paths]
+    finally:
+        _cleanup(student_id, *seeded)
+
+    expected = json.loads(results[0][2])
+    assert len(expected) == rows, len(expected)
+    for label, _, body in results[1:]:
+        assert json.loads(body) == expected, f"{label} returned a different document"
+
+    print(f"{'path':<30}{'ms':>10}{'rows/s':>14}{'bytes':>12}")
+    for label, elapsed, body in results:
+        print(f"{label:<30}{elapsed * 1000:>10.1f}{rows / elapsed:>14.0f}{len(body):>12}")
+    print(f"Speedup vs dict + stdlib json: {results[0][1] / results[-1][1]:.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the submissions list route end to end.")
+    parser.add_argument("--rows", type=int, default=10000, help="Submissions to seed (default: 10000)")
+    parser.add_argument("--runs", type=int, default=5, help="Requests per path to take the best of (default: 5)")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.runs))
@@ -1,4 +1,5 @@
 \
+import os
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 
@@ -18,5 +19,13 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={"detail": "An internal server error occurred."},
     )
 
+async def pool_exhausted_handler(request: Request, exc: Exception):
+    """No database connection freed up within DB_POOL_TIMEOUT: tell the client to retry, like a shed request."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly."},
+        headers={"Retry-After": os.getenv('ADMISSION_RETRY_AFTER', '2')},
+    )
+
 # Add more specific error handlers if needed
 
@@ -0,0 +1,35 @@
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Time-ordered IDs for the partitioned tables (submission, evaluated_script, recheck).
+# Layout follows UUIDv7: 48-bit unix timestamp in milliseconds, version 7,
+# then random bits. IDs created close together sort close together, so B-tree
+# inserts land at the right edge of the index and each month maps to one id range.
+
+
+def uuid7(ms: int = None) -> uuid.UUID:
+    """Returns a new UUIDv7 for the current time (or the given unix time in ms)."""
+    if ms is None:
+        ms = time.time_ns() // 1_000_000
+    rand_a = int.from_bytes(os.urandom(2), 'big') & 0xFFF
+    rand_b = int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76       # version
+    value |= rand_a << 64
+    value |= 0b10 << 62      # RFC 4122 variant
+    value |= rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_bound(when: datetime) -> uuid.UUID:
+    """
+    Returns the smallest UUIDv7 that can be generated at `when`. Used as a range
+    bound for partitions and for `id >= ...` filters that let Postgres prune partitions.
+    Naive datetimes are treated as UTC.
+    """
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    ms = int(when.timestamp() * 1000)
+    return uuid.UUID(int=(ms & 0xFFFF_FFFF_FFFF) << 80)
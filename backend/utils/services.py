@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import threading
+
+# Lazily initialized heavy clients (database pool, storage, LLM, OCR).
+# Nothing is created at import time, so every worker process starts fast and
+# builds its own clients after the fork, on first use. app.py's lifespan calls
+# `shutdown()` so background evaluations drain and clients are closed cleanly.
+# SDK imports live inside the factories for the same reason.
+
+logger = logging.getLogger(__name__)
+
+
+def _create_db_pool():
+    from database.db_connection import create_pool
+    return create_pool()
+
+
+def _close_db_pool(pool):
+    pool.closeall()
+
+
+def _create_replica_pools():
+    from database.db_connection import create_replica_pools
+    return create_replica_pools()
+
+
+def _close_replica_pools(pools):
+    for pool in pools.values():
+        pool.closeall()
+
+
+def _create_storage_bucket():
+    from utils.firebase import create_bucket
+    return create_bucket()
+
+
+def _create_llm_client():
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+    return genai.GenerativeModel(os.getenv('LLM_MODEL', 'gemini-pro'))
+
+
+def _create_ocr_client():
+    from google.cloud import documentai
+    location = os.getenv('DOCAI_LOCATION', 'us')
+    client_options = {"api_endpoint": f"{location}-documentai.googleapis.com"}
+    return documentai.DocumentProcessorServiceClient(client_options=client_options)
+
+
+# name -> (factory, close function or None)
+_FACTORIES = {
+    'db_pool': (_create_db_pool, _close_db_pool),
+    'replica_pools': (_create_replica_pools, _close_replica_pools),
+    'storage': (_create_storage_bucket, None),
+    'llm': (_create_llm_client, None),
+    'ocr': (_create_ocr_client, None),
+}
+
+_lock = threading.Lock()
+_instances = {}
+_background = set()
+
+
+def get(name: str):
+    """Returns the named client, creating it on first use."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    factory, _ = _FACTORIES[name]
+    with _lock:
+        if name not in _instances:
+            logger.info(f"Initializing service '{name}'")
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def run_in_background(coro):
+    """
+    Schedules `coro` (e.g. an LLM evaluation) on the event loop and tracks it,
+    so shutdown waits for it instead of cutting it off mid-way.
+    """
+    task = asyncio.get_running_loop().create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
+
+
+async def drain(timeout: float):
+    """Waits up to `timeout` seconds for tracked background work, then cancels the rest."""
+    if not _background:
+        return
+    logger.info(f"Draining {len(_background)} in-flight background tasks...")
+    done, pending = await asyncio.wait(set(_background), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"Cancelled {len(pending)} background tasks still running after {timeout}s")
+
+
+def close_all():
+    """Closes every initialized client. They are re-created lazily if used again."""
+    with _lock:
+        for name, instance in list(_instances.items()):
+            _, close = _FACTORIES[name]
+            if close is not None:
+                try:
+                    close(instance)
+                except Exception as e:
+                    logger.error(f"Error closing service '{name}': {e}")
+        _instances.clear()
+
+
+async def shutdown():
+    await drain(float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '30')))
+    close_all()
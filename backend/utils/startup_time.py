@@ -0,0 +1,63 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Measures how long a fresh worker takes to import the app and fails if it is
+# over budget, so a new eager SDK import shows up before it reaches production.
+# Run from the backend/ directory (exits 1 when over budget, e.g. in CI):
+#   python -m utils.startup_time --budget 2.0
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def measure(module: str = 'app'):
+    """
+    Imports `module` in a fresh interpreter. Returns (wall seconds, [(cumulative us, name)])
+    for the imports made directly by `module`, i.e. one level below it, each including
+    everything it pulls in.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    imports, children = [], []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:   self [us] |  cumulative | imported package", nested
+        # imports indented two spaces per level and listed before their parent.
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                imports = children
+            children = []
+    imports.sort(reverse=True)
+    return elapsed, imports
+
+
+if __name__ == '__main__':
+    default_budget = float(os.getenv('STARTUP_BUDGET_SECONDS', 2.0))
+    parser = argparse.ArgumentParser(description="Check app import time against a budget.")
+    parser.add_argument("--budget", type=float, default=default_budget, help=f"Allowed seconds (default: {default_budget})")
+    parser.add_argument("--runs", type=int, default=3, help="Runs to take the best of (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports made by app.py to show (default: 10)")
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    elapsed, imports = min(results)
+    for cumulative, name in imports[:args.top]:
+        print(f"{cumulative / 1000:>10.1f} ms  {name}")
+    print(f"Startup import time: {elapsed:.3f}s (budget {args.budget:.3f}s)")
+    if elapsed > args.budget:
+        print("Over budget: move heavy imports into utils/services.py factories.")
+        sys.exit(1)
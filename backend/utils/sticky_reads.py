@@ -0,0 +1,47 @@
+import math
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from database.db_connection import STICKY_SECONDS, track_request_writes
+
+# Carries read-your-writes state across worker processes. After a request that
+# wrote to the primary, the response sets a `last_write` cookie and an
+# X-Last-Write header (unix seconds). Whichever worker gets the next request reads
+# either one back and sends that client's reads to the primary while it is fresh.
+
+COOKIE_NAME = 'last_write'
+HEADER_NAME = 'x-last-write'
+
+
+def _parse(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StickyReadsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        conn = HTTPConnection(scope)
+        client_last_write = _parse(conn.headers.get(HEADER_NAME)) or _parse(conn.cookies.get(COOKIE_NAME))
+        holder = track_request_writes(client_last_write)
+
+        async def send_with_last_write(message: Message):
+            if message['type'] == 'http.response.start' and holder['wrote_at'] is not None:
+                headers = MutableHeaders(scope=message)
+                value = f"{holder['wrote_at']:.3f}"
+                headers.append(HEADER_NAME, value)
+                headers.append(
+                    'set-cookie',
+                    f"{COOKIE_NAME}={value}; Max-Age={math.ceil(STICKY_SECONDS)}; Path=/api; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)